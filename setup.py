@@ -1,4 +1,4 @@
-from distutils.core import setup
+from setuptools import setup
 
 with open('LICENSE') as file:
     license = file.read()
@@ -9,6 +9,8 @@ setup(
     url='https://github.com/elyezer/stalker/',
     author='Elyézer Rezende',
     packages=['stalker'],
+    python_requires='>=3.9',
+    install_requires=['pyserial>=3.1'],
     description='Stalker is an application that uses bluetooth to track '
                 'position inside buildings',
     license=license,
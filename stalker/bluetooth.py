@@ -1,10 +1,14 @@
 import functools
-import Queue as queue
+import logging
 import serial
 import struct
+import sys
 import threading
 
 
+logger = logging.getLogger(__name__)
+
+
 BLUETOOTH_EVENTS = {
     0x05: 'Disconnection Complete',
     0x08: 'Encryption Change',
@@ -56,7 +60,39 @@ ATT_EVENT_STATUS = {
 }
 
 
-IO_TIMEOUT = 2
+def _name_table(events):
+    """Return a list mapping every one-byte code to its interned name."""
+    names = [None] * 256
+    for code, name in events.items():
+        names[code] = sys.intern(name)
+    return names
+
+
+_BT_EVENT_NAMES = _name_table(BLUETOOTH_EVENTS)
+_LE_EVENT_NAMES = _name_table(BLUETOOTH_LE_EVENTS)
+
+# Log lines for each known event, so nothing is formatted per event
+_BT_EVENT_MSGS = [
+    None if name is None else 'Bluetooth event "%s"' % name
+    for name in _BT_EVENT_NAMES]
+_LE_EVENT_MSGS = [
+    None if name is None else 'Bluetooth LE event "%s"' % name
+    for name in _LE_EVENT_NAMES]
+
+
+_structs = {}
+
+
+def _get_struct(fmt):
+    """Return a cached ``struct.Struct`` for ``fmt``."""
+    try:
+        return _structs[fmt]
+    except KeyError:
+        s = _structs[fmt] = struct.Struct(fmt)
+        return s
+
+
+_U_BB = struct.Struct('<BB').unpack_from
 
 
 class Packet(object):
@@ -67,7 +103,8 @@ class Packet(object):
         if cls is Packet:
             raise TypeError('from_data should be called on Packet subclass')
 
-        packet_type = struct.unpack('B', data[0])[0]
+        data = memoryview(data)
+        packet_type = data[0]
 
         if packet_type == cls.packet_type:
             return cls.parse(data[1:])
@@ -86,16 +123,17 @@ class Command(Packet):
         self.opcode = opcode
         self.fmt = fmt
         self.params = params
+        self._struct = _get_struct('<BHB' + (fmt or ''))
+        # Parameters size, the 4 byte header is not included
+        self.size = self._struct.size - 4
 
     @classmethod
     def parse(cls, data):
         return cls()
 
     def serialize(self):
-        fmt = '<BHB%s' % self.fmt
-        size = struct.calcsize('<%s' % self.fmt)
-        return struct.pack(
-            fmt, self.packet_type, self.opcode, size, *self.params)
+        return self._struct.pack(
+            self.packet_type, self.opcode, self.size, *self.params)
 
 
 class Event(Packet):
@@ -105,39 +143,69 @@ class Event(Packet):
         self.code = code
         self.fmt = fmt
         self.params = params
+        self._struct = _get_struct('<BBB' + (fmt or ''))
+        # Parameters size, the 3 byte header is not included
+        self.size = self._struct.size - 3
 
     @classmethod
     def parse(cls, data):
         return cls()
 
     def serialize(self):
-        fmt = '<BB%s' % self.fmt
-        size = struct.calcsize('<%s' % self.fmt)
-        return struct.pack(
-            fmt, self.packet_type, self.code, size, *self.params)
+        return self._struct.pack(
+            self.packet_type, self.code, self.size, *self.params)
+
 
+def command(opcode, fmt):
+    """
+    Make the decorated method send the command ``opcode``.
 
-def command(f):
-    @functools.wraps(f)
-    def wrapper(*args, **kwargs):
-        packet = f(*args, **kwargs)
+    The method returns the command parameters, packed according to ``fmt``.
+    The packet Struct is built once, when the method is decorated.
+    """
+    packer = _get_struct('<BHB' + fmt)
+    pack = packer.pack
+    # Parameters size, the 4 byte header is not included
+    size = packer.size - 4
 
-        if isinstance(args[0], BluetoothDevice):
-            args[0].packet_queue.put(packet)
+    def decorator(f):
+        @functools.wraps(f)
+        def wrapper(*args, **kwargs):
+            packet = pack(
+                Command.packet_type, opcode, size, *f(*args, **kwargs))
 
-        return packet
-    return wrapper
+            if isinstance(args[0], BluetoothDevice):
+                args[0].send(packet)
+
+            return packet
+        return wrapper
+    return decorator
 
 
 class BluetoothDevice(object):
     def __init__(self, port=None, baudrate=57600):
         self.ready = False
-        self.serial = serial.Serial(port, baudrate, timeout=IO_TIMEOUT)
-        self.packet_queue = queue.Queue()
-
-    @command
+        self.serial = serial.Serial(port, baudrate, timeout=None)
+        self._stop_event = threading.Event()
+        self._write_lock = threading.Lock()
+        # Bytes received but not yet parsed into packets
+        self._rxbuf = bytearray()
+
+        # LE events are keyed by 0x3e00 | sub event code
+        self._event_handlers = handlers = {}
+        for event_code, msg in enumerate(_BT_EVENT_MSGS):
+            if msg is not None:
+                handlers[event_code] = functools.partial(
+                    self._bluetooth_event, msg)
+        for sub_event_code, msg in enumerate(_LE_EVENT_MSGS):
+            if msg is not None:
+                handlers[0x3e00 | sub_event_code] = functools.partial(
+                    self._bluetooth_event, msg)
+        handlers[0xff] = self._vendor_event
+
+    @command(0xfe00, 'BB16s16sL')
     def init_device(self, profile_role=0x08, max_scan_responses=0x03,
-                    irk='\x00', csrk='\x00', sign_counter=0x01):
+                    irk=b'\x00', csrk=b'\x00', sign_counter=0x01):
         """
         GAP_DeviceInit
 
@@ -168,10 +236,9 @@ class BluetoothDevice(object):
             0x00 SUCCESS
             0x02 INVALIDPARAMETER
         """
-        return Command(0xfe00, 'BB16s16sL', profile_role, max_scan_responses,
-                       irk, csrk, sign_counter)
+        return profile_role, max_scan_responses, irk, csrk, sign_counter
 
-    @command
+    @command(0xfe04, 'BBB')
     def discovery(self, mode=3, active_scan=1, white_list=0):
         """
         GAP_DeviceDiscoveryRequest
@@ -194,75 +261,112 @@ class BluetoothDevice(object):
             0x11 Scan is not available.
             0x12 Invalid profile role.
         """
-        return Command(0xfe04, 'BBB', mode, active_scan, white_list)
+        return mode, active_scan, white_list
 
     def _start_reader(self):
         self._reader_alive = True
-        self.receiver_thread = threading.Thread(target=self.reader)
-        self.receiver_thread.setDaemon(True)
+        self.receiver_thread = threading.Thread(
+            target=self.reader, daemon=True)
         self.receiver_thread.start()
 
     def _stop_reader(self):
         self._reader_alive = False
+        self.serial.cancel_read()
         self.receiver_thread.join()
 
+    @property
+    def alive(self):
+        return not self._stop_event.is_set()
+
     def start(self):
-        self.alive = True
+        self._stop_event.clear()
         self._start_reader()
-        self.transmitter_thread = threading.Thread(target=self.writer)
-        self.transmitter_thread.setDaemon(True)
-        self.transmitter_thread.start()
 
         self.init_device()
 
     def stop(self):
-        self.alive = False
+        self._stop_event.set()
+        # Wake up the reader so it notices the stop request
+        self.serial.cancel_read()
 
     def join(self, transmit_only=False):
-        self.transmitter_thread.join()
+        # Packets are written as they are sent, there is no transmitter
+        # thread to wait for
         if not transmit_only:
             self.receiver_thread.join()
 
     def reader(self):
         try:
+            rxbuf = self._rxbuf
+            handlers = self._event_handlers
             while self.alive and self._reader_alive:
-                data = self.serial.read()
-
-                if not data:
-                    continue
-
-                packet_type = struct.unpack('<B', data)[0]
-
-                if packet_type == Event.packet_type:
-                    event_code, params_len = struct.unpack(
-                        '<BB', self.serial.read(2))
-                    params_data = self.serial.read(params_len)
-
-                    if event_code == 0xff:
-                        print 'Vendor specific event'
-                    elif event_code in BLUETOOTH_EVENTS:
-                        event = BLUETOOTH_EVENTS[event_code]
-                        print 'Bluetooth event "%s"' % event
-                    elif event_code == 0x3e:
-                        sub_event_code = struct.unpack('<B', params_data[0])[0]
-                        event = BLUETOOTH_LE_EVENTS[sub_event_code]
-                        print 'Bluetooth LE event "%s"' % event
-                    else:
-                        print 'Unknown event code %02x' % event_code
-                else:
-                    print 'wrong packet type %02x' % packet_type
-        except serial.SerialException:
-            self.alive = False
-            raise
+                rxbuf += self.serial.read(self.serial.in_waiting or 1)
+
+                # Parse every complete packet, then drop them all at once
+                start = 0
+                end = len(rxbuf)
+                with memoryview(rxbuf) as view:
+                    while start < end:
+                        packet_type = rxbuf[start]
+
+                        if packet_type != Event.packet_type:
+                            logger.warning(
+                                'wrong packet type %02x', packet_type)
+                            start += 1
+                            continue
+
+                        if end - start < 3:
+                            break
+
+                        event_code, params_len = _U_BB(rxbuf, start + 1)
+                        params_start = start + 3
+                        packet_end = params_start + params_len
+
+                        if end < packet_end:
+                            break
+
+                        if event_code == 0x3e and params_len:
+                            event_code = 0x3e00 | rxbuf[params_start]
+
+                        handler = handlers.get(event_code)
+                        if handler is not None:
+                            handler(view[params_start:packet_end])
+                        else:
+                            self._unknown_event(event_code)
+
+                        start = packet_end
 
-    def writer(self):
-        try:
-            while self.alive:
                 try:
-                    packet = self.packet_queue.get(timeout=IO_TIMEOUT)
-                    self.serial.write(packet.serialize())
-                except queue.Empty:
-                    pass
-        except:
-            self.alive = False
+                    del rxbuf[:start]
+                except BufferError:
+                    # A handler kept a view of its parameters, leave it the
+                    # old buffer and carry on with a copy of what is left
+                    self._rxbuf = rxbuf = rxbuf[start:]
+        except serial.SerialException:
+            self.stop()
             raise
+
+    def _bluetooth_event(self, msg, params_data):
+        """
+        Handle a known Bluetooth or LE event.
+
+        Like every event handler, ``params_data`` is a memoryview into the
+        receive buffer. Copy it, e.g. with ``bytes(params_data)``, to keep the
+        parameters after the call.
+        """
+        logger.debug(msg)
+
+    def _vendor_event(self, params_data):
+        """Handle a vendor specific event, see ``_bluetooth_event``."""
+        logger.debug('Vendor specific event')
+
+    def _unknown_event(self, event_code):
+        logger.warning('Unknown event code %02x', event_code)
+
+    def send(self, packet):
+        """Write ``packet``, a Packet or its serialized bytes, to the port."""
+        if not isinstance(packet, bytes):
+            packet = packet.serialize()
+
+        with self._write_lock:
+            self.serial.write(packet)
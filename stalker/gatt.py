@@ -28,10 +28,10 @@ Status: (1 octet)
 | 0x14 | bleNotConnected |
 | 0x40 | bleInvalidPDU |
 """
-from stalker.bluetooth import Command, Event
+from stalker.bluetooth import Command
 
 
-class DiscCharsByUUID(Event):
+class DiscCharsByUUID(Command):
     """
     This sub-procedure is used by a client to discover service characteristics
     on a server when only the service handle ranges are known and the
@@ -44,9 +44,15 @@ class DiscCharsByUUID(Event):
     char_type: 2 or 16 octet UUID
     """
 
+    # Parameters format by char_type length
+    _FMTS = {2: 'HHH2s', 16: 'HHH16s'}
+
     def __init__(self, connection_handle, start_handle, end_handle, char_type):
-        fmt = 'HHH%ds' % len(char_type)
-        super(DiscCharsByUUID, self).__init__(
+        try:
+            fmt = self._FMTS[len(char_type)]
+        except KeyError:
+            raise ValueError('char_type should be a 2 or 16 octet UUID')
+        super().__init__(
             0xfd88, fmt, connection_handle, start_handle, end_handle, char_type)
 
     @classmethod
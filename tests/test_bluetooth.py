@@ -1,9 +1,113 @@
 import unittest
 
-from stalker.bluetooth import CommandPacket
+from stalker.bluetooth import BluetoothDevice, Command, Event
 
 
 class CommandPacketTestCase(unittest.TestCase):
     def test_command_packet_from_data(self):
-        data = '\x01'
-        packet = CommandPacket.from_data(data)
+        data = b'\x01'
+        packet = Command.from_data(data)
+        self.assertIsInstance(packet, Command)
+
+    def test_command_serialize(self):
+        packet = Command(0xfe04, 'BBB', 3, 1, 0)
+        self.assertEqual(
+            packet.serialize(), b'\x01\x04\xfe\x03\x03\x01\x00')
+
+
+class EventPacketTestCase(unittest.TestCase):
+    def test_event_serialize(self):
+        packet = Event(0x0e, 'BH', 1, 0xfe04)
+        self.assertEqual(packet.serialize(), b'\x04\x0e\x03\x01\x04\xfe')
+
+
+class FakeSerial(object):
+    """Serial port stub returning preset chunks, then stopping the device."""
+
+    def __init__(self, device, chunks):
+        self.device = device
+        self.chunks = list(chunks)
+
+    @property
+    def in_waiting(self):
+        return len(self.chunks[0]) if self.chunks else 0
+
+    def read(self, size=1):
+        if not self.chunks:
+            self.device.stop()
+            return b''
+        return self.chunks.pop(0)
+
+    def cancel_read(self):
+        pass
+
+
+class BluetoothDeviceReaderTestCase(unittest.TestCase):
+    def read(self, *chunks):
+        """Run the reader over ``chunks`` and return the handled events."""
+        device = BluetoothDevice()
+        device.serial = FakeSerial(device, chunks)
+        device._reader_alive = True
+        events = []
+        for key in list(device._event_handlers):
+            device._event_handlers[key] = (
+                lambda params, key=key: events.append((key, bytes(params))))
+        device._unknown_event = lambda code: events.append((code, None))
+        device.reader()
+        self.assertFalse(device.alive)
+        return events, device
+
+    def test_events(self):
+        events, device = self.read(
+            b'\x04\x0e\x02\xaa\xbb'
+            b'\x04\x3e\x02\x02\x00'
+            b'\x04\xff\x01\x01'
+            b'\x04\x99\x00'
+            b'\x04\x3e\x01\x09')
+        self.assertEqual(events, [
+            (0x0e, b'\xaa\xbb'),
+            (0x3e02, b'\x02\x00'),
+            (0xff, b'\x01'),
+            (0x99, None),
+            (0x3e09, None),
+        ])
+        self.assertEqual(device._rxbuf, b'')
+
+    def test_split_packets(self):
+        events, device = self.read(
+            b'\x04', b'\x0e', b'\x02\xaa', b'\xbb\x04\x3e\x02\x02', b'\x00\x04')
+        self.assertEqual(
+            events, [(0x0e, b'\xaa\xbb'), (0x3e02, b'\x02\x00')])
+        # The start of the next packet is kept for the following read
+        self.assertEqual(device._rxbuf, b'\x04')
+
+    def test_wrong_packet_type(self):
+        with self.assertLogs('stalker.bluetooth', 'WARNING') as logs:
+            events, device = self.read(b'\x07\x01\x04\x0e\x00')
+        self.assertEqual(events, [(0x0e, b'')])
+        self.assertEqual(logs.output, [
+            'WARNING:stalker.bluetooth:wrong packet type 07',
+            'WARNING:stalker.bluetooth:wrong packet type 01',
+        ])
+
+    def test_handler_keeping_params(self):
+        device = BluetoothDevice()
+        device.serial = FakeSerial(
+            device, [b'\x04\x0e\x02\xaa\xbb\x04', b'\x0e\x01\xcc'])
+        device._reader_alive = True
+        kept = []
+        device._event_handlers[0x0e] = kept.append
+        device.reader()
+        self.assertEqual([bytes(p) for p in kept], [b'\xaa\xbb', b'\xcc'])
+
+
+class CommandDecoratorTestCase(unittest.TestCase):
+    def test_init_device(self):
+        packet = BluetoothDevice.init_device(object())
+        self.assertEqual(
+            packet,
+            b'\x01\x00\xfe\x26\x08\x03' + b'\x00' * 32 + b'\x01\x00\x00\x00')
+
+    def test_discovery(self):
+        packet = BluetoothDevice.discovery(object(), mode=1)
+        self.assertEqual(packet, b'\x01\x04\xfe\x03\x01\x01\x00')
@@ -0,0 +1,22 @@
+import unittest
+
+from stalker.gatt import DiscCharsByUUID
+
+
+class DiscCharsByUUIDTestCase(unittest.TestCase):
+    def test_serialize_16_bit_uuid(self):
+        packet = DiscCharsByUUID(1, 1, 0xffff, b'\x00\x28')
+        self.assertEqual(
+            packet.serialize(),
+            b'\x01\x88\xfd\x08\x01\x00\x01\x00\xff\xff\x00\x28')
+
+    def test_serialize_128_bit_uuid(self):
+        uuid = bytes(range(16))
+        packet = DiscCharsByUUID(1, 1, 0xffff, uuid)
+        self.assertEqual(
+            packet.serialize(),
+            b'\x01\x88\xfd\x16\x01\x00\x01\x00\xff\xff' + uuid)
+
+    def test_invalid_uuid_length(self):
+        with self.assertRaises(ValueError):
+            DiscCharsByUUID(1, 1, 0xffff, b'\x00\x28\x00')